@@ -5,11 +5,12 @@ import webbrowser
 import datetime
 from plyer import notification
 import pyautogui
-import wikipedia
 import pywhatkit as pwk
 import user_config
 import smtplib, ssl
 import gemini_ai as ai
+import memory_index
+import wiki_cache
 import img_gen
 import mtranslate
 import sys
@@ -32,6 +33,9 @@ def signal_handler(sig, frame):
 signal.signal(signal.SIGINT, signal_handler)
 signal.signal(signal.SIGTERM, signal_handler)
 
+# Local Wikipedia summary cache (see wiki_cache.py to prefetch topics)
+wiki = wiki_cache.WikiCache()
+
 engine = pyttsx3.init()
 voices = engine.getProperty('voices')
 engine.setProperty('voice', voices[1].id)
@@ -122,6 +126,8 @@ def command():
 def main_process():
     global running
     jarvis_chat = []
+    # Long-term conversation memory, kept across runs
+    memory = memory_index.ConversationMemory("conversation_memory.jsonl")
     print("MAN-I is now running and listening...", flush=True)
     
     while running:
@@ -202,7 +208,7 @@ def main_process():
             request = request.replace("search wikipedia", "")
             print(request, flush=True)
             try:
-                result = wikipedia.summary(request, sentences=2)
+                result = wiki.lookup(request, sentences=2)
                 print(result, flush=True)
                 speak(result)
             except Exception as e:
@@ -251,6 +257,7 @@ def main_process():
 
         elif "clear chat" in request:
             jarvis_chat = []
+            memory.clear()
             speak("chat cleared")
             time.sleep(0.5)
         
@@ -260,24 +267,22 @@ def main_process():
             break
             
         else:
-            # Keep chat history manageable (max 10 exchanges)
-            if len(jarvis_chat) > 20:
-                jarvis_chat = jarvis_chat[-10:]
-                
             request = request.replace("jarvis", "")
+            # Only relevant past turns plus the latest few are sent to the AI
+            jarvis_chat = memory.build_context(request)
             jarvis_chat.append({"role": "user", "content": request})
             
             try:
-                response = ai.send_request(jarvis_chat)
+                # raise_errors so the fallback apology never ends up in memory
+                response = ai.send_request(jarvis_chat, raise_errors=True)
                 if response:
-                    jarvis_chat.append({"role": "assistant", "content": response})
+                    memory.add("user", request)
+                    memory.add("assistant", response)
                     speak(response)
                 else:
                     speak("Sorry, I couldn't process that request.")
-                    jarvis_chat.pop()
             except Exception as e:
                 speak("Sorry, there was an error processing your request.")
-                jarvis_chat.pop()
             
             time.sleep(0.5)
 
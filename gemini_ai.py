@@ -1,5 +1,9 @@
 import google.genai as genai
 from google.genai import types
+import re
+import threading
+import time
+from collections import deque
 import user_config
 
 # Configure Gemini with your API key
@@ -8,14 +12,143 @@ client = genai.Client(api_key=user_config.google_api_key)
 # Using the latest flash model
 MODEL_NAME = "gemma-3-27b-it"  # or "gemini-1.5-flash"
 
-def send_request(query):
+# Smaller model used for short, simple turns (greetings, quick facts)
+FAST_MODEL_NAME = "gemma-3-4b-it"
+
+# Models the router may pick from, cheapest first
+MODEL_CANDIDATES = [FAST_MODEL_NAME, MODEL_NAME]
+
+# Routing thresholds
+SIMPLE_PROMPT_MAX_CHARS = 200      # last user message longer than this counts as complex
+SIMPLE_CONTEXT_MAX_CHARS = 2000    # whole prompt longer than this counts as complex
+COMPLEX_KEYWORDS = ("explain", "why", "compare", "analyze", "analyse", "step by step",
+                    "write", "code", "program", "calculate", "solve", "difference between")
+# Whole words only, so "decode" or "programme" don't count as "code"/"program"
+_COMPLEX_RE = re.compile(r"\b(?:" + "|".join(re.escape(k) for k in COMPLEX_KEYWORDS) + r")\b")
+STATS_WINDOW = 20                  # recent calls kept per model
+STATS_MAX_AGE = 120                # seconds; older calls are forgotten so a demoted model gets retried
+MAX_ERROR_RATE = 0.5               # skip a model above this recent error rate
+MAX_AVG_LATENCY = 15.0             # skip a model slower than this (seconds, recent average)
+
+
+class ModelRouter:
+    """Pick a model per request from prompt complexity and recent per-model latency/errors."""
+
+    def __init__(self, candidates, default_model):
+        self.candidates = list(candidates)
+        self.default_model = default_model
+        self.lock = threading.Lock()
+        self.stats = {}
+        for model in self.candidates:
+            self.stats[model] = {
+                "requests": 0,
+                "errors": 0,
+                "recent": deque(maxlen=STATS_WINDOW)
+            }
+
+    def is_complex(self, last_message, prompt):
+        text = last_message.lower()
+        if len(last_message) > SIMPLE_PROMPT_MAX_CHARS or len(prompt) > SIMPLE_CONTEXT_MAX_CHARS:
+            return True
+        if "```" in last_message or "\n" in last_message.strip():
+            return True
+        return _COMPLEX_RE.search(text) is not None
+
+    def _recent(self, model):
+        """(latency, ok) pairs from the last STATS_MAX_AGE seconds"""
+        cutoff = time.monotonic() - STATS_MAX_AGE
+        return [(latency, ok) for ts, latency, ok in self.stats[model]["recent"] if ts >= cutoff]
+
+    def _avg_latency(self, model):
+        """Recent average latency of successful calls (0.0 with no data, so untried models get a turn)"""
+        latencies = [latency for latency, ok in self._recent(model) if ok]
+        return sum(latencies) / len(latencies) if latencies else 0.0
+
+    def _healthy(self, model):
+        recent = self._recent(model)
+        if not recent:
+            return True
+        error_rate = sum(1 for _, ok in recent if not ok) / len(recent)
+        return error_rate <= MAX_ERROR_RATE and self._avg_latency(model) <= MAX_AVG_LATENCY
+
+    def select(self, last_message, prompt):
+        """Return the ordered list of models to try for this prompt."""
+        if self.is_complex(last_message, prompt):
+            start = self.candidates.index(self.default_model)
+        else:
+            start = 0
+        eligible = self.candidates[start:]
+        with self.lock:
+            healthy = [m for m in eligible if self._healthy(m)]
+            # Fastest healthy model first; ties keep the cheaper-first candidate order
+            healthy.sort(key=self._avg_latency)
+        ordered = healthy + [m for m in eligible if m not in healthy]
+        # Always keep the default model as the last resort
+        if self.default_model not in ordered:
+            ordered.append(self.default_model)
+        return ordered
+
+    def record(self, model, latency, ok):
+        with self.lock:
+            entry = self.stats.setdefault(model, {
+                "requests": 0,
+                "errors": 0,
+                "recent": deque(maxlen=STATS_WINDOW)
+            })
+            entry["requests"] += 1
+            if not ok:
+                entry["errors"] += 1
+            entry["recent"].append((time.monotonic(), latency, ok))
+
+    def get_stats(self):
+        with self.lock:
+            result = {}
+            for model, entry in self.stats.items():
+                recent = self._recent(model)
+                latencies = [latency for latency, ok in recent if ok]
+                result[model] = {
+                    "requests": entry["requests"],
+                    "errors": entry["errors"],
+                    "recent_error_rate": round(sum(1 for _, ok in recent if not ok) / len(recent), 3) if recent else 0.0,
+                    "recent_avg_latency": round(sum(latencies) / len(latencies), 3) if latencies else None,
+                    "healthy": self._healthy(model)
+                }
+            return result
+
+
+router = ModelRouter(MODEL_CANDIDATES, MODEL_NAME)
+
+
+def _generate(last_message, prompt):
+    """Send prompt to the routed model, falling back to the next candidate on error."""
+    last_error = None
+    for model in router.select(last_message, prompt):
+        started = time.perf_counter()
+        try:
+            print(f"🤖 AI Request received - Using model: {model}", flush=True)
+            response = client.models.generate_content(
+                model=model,
+                contents=prompt
+            )
+            router.record(model, time.perf_counter() - started, True)
+            return response.text
+        except Exception as e:
+            router.record(model, time.perf_counter() - started, False)
+            print(f"⚠️ Model {model} failed: {str(e)[:100]}", flush=True)
+            last_error = e
+    raise last_error
+
+def get_model_stats():
+    """Per-model request counts, recent error rate and latency"""
+    return router.get_stats()
+
+def send_request(query, raise_errors=False):
     """
     Send request to Gemini AI
     query: List of message dictionaries in format [{"role": "user", "content": "message"}]
+    raise_errors: re-raise API errors instead of returning a fallback message
     """
     try:
-        print(f"🤖 AI Request received - Using model: {MODEL_NAME}", flush=True)
-        
         if not query or len(query) == 0:
             return "Please say something for me to respond to."
         
@@ -43,28 +176,23 @@ MAN-I:"""
         
         print(f"📤 Sending to Gemini...", flush=True)
         
-        response = client.models.generate_content(
-            model=MODEL_NAME,
-            contents=prompt
-        )
+        response_text = _generate(last_message, prompt)
         
         print(f"✅ AI Response received", flush=True)
-        return response.text
+        return response_text
         
     except Exception as e:
         error_str = str(e)
         print(f"❌ Gemini API Error: {error_str}", flush=True)
+        if raise_errors:
+            raise
         return f"I'm having trouble processing your request. Please try again."
 
 def simple_send_request(query):
     """Simple version without chat history"""
     try:
         last_message = query[-1]["content"] if query else "Hello"
-        response = client.models.generate_content(
-            model=MODEL_NAME,
-            contents=last_message
-        )
-        return response.text
+        return _generate(last_message, last_message)
     except Exception as e:
         print(f"❌ Simple request error: {e}", flush=True)
         return "I'm having trouble connecting. Please try again."
@@ -83,6 +211,6 @@ def list_available_models():
 # Run this when file is imported
 try:
     list_available_models()
-    print(f"✅ Using model: {MODEL_NAME}")
+    print(f"✅ Using models: {', '.join(MODEL_CANDIDATES)} (default: {MODEL_NAME})")
 except:
     pass
\ No newline at end of file
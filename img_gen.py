@@ -1,6 +1,11 @@
 import os
 import requests
 import uuid
+import hashlib
+import tempfile
+import mimetypes
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from PIL import Image, ImageDraw
 import user_config  # Import your config
@@ -8,6 +13,25 @@ import user_config  # Import your config
 GENERATED_IMAGES_DIR = os.path.join(os.getcwd(), 'generated_images')
 os.makedirs(GENERATED_IMAGES_DIR, exist_ok=True)
 
+# Post-processed copies (WebP/AVIF + thumbnails) live in a subfolder so
+# listdir-based endpoints only see the originals
+VARIANTS_DIR = os.path.join(GENERATED_IMAGES_DIR, 'variants')
+os.makedirs(VARIANTS_DIR, exist_ok=True)
+THUMBNAIL_SIZES = (128, 256, 512)
+VARIANT_QUALITY = 80
+POSTPROCESS_WORKERS = 2
+
+# Worker responses are streamed to disk in chunks of this size
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+CONTENT_TYPE_EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/webp": ".webp"
+}
+
+_postprocess_pool = None
+_pool_lock = threading.Lock()
+
 # Read from user_config
 WORKER_API_URL = user_config.WORKER_API_URL
 WORKER_API_KEY = user_config.WORKER_API_KEY
@@ -25,34 +49,79 @@ class FreeImageGenerator:
         print(f"✅ API Key set: {masked_key}")
 
     def generate_image(self, prompt):
-        """Generate image using your Cloudflare Worker."""
+        """Generate image using your Cloudflare Worker. Returns the saved file path."""
+        return self.generate_image_file(prompt)["path"]
+
+    def generate_image_file(self, prompt):
+        """
+        Generate image using your Cloudflare Worker, streaming it straight to disk.
+        Returns {"path", "sha256", "size", "content_type"} for the saved file.
+        """
         try:
             print(f"🎨 Generating via Worker: {prompt[:50]}...")
             payload = {"prompt": prompt}
-            response = requests.post(
+            with requests.post(
                 self.api_url,
                 headers=self.headers,
                 json=payload,
-                timeout=60
-            )
-            if response.status_code == 200:
-                # Worker returns image binary (JPEG)
-                return self._save_image_bytes(response.content, "worker")
-            else:
-                print(f"❌ Worker error: {response.status_code} - {response.text}")
-                return self._generate_placeholder(prompt)
+                timeout=60,
+                stream=True
+            ) as response:
+                if response.status_code == 200:
+                    # Worker returns image binary (JPEG)
+                    return self._stream_to_file(response, "worker")
+                else:
+                    print(f"❌ Worker error: {response.status_code} - {response.text}")
         except Exception as e:
             print(f"❌ Generation failed: {e}")
-            return self._generate_placeholder(prompt)
+        return self._file_info(self._generate_placeholder(prompt))
 
-    def _save_image_bytes(self, image_bytes, prefix):
+    def _stream_to_file(self, response, prefix):
+        """Copy a streamed response to a temp file, hashing as we go, then rename into place."""
+        content_type = response.headers.get("Content-Type", "image/jpeg").split(";")[0].strip().lower()
+        extension = CONTENT_TYPE_EXTENSIONS.get(content_type, ".jpg")
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{prefix}_{timestamp}_{uuid.uuid4().hex[:8]}.jpg"
+        filename = f"{prefix}_{timestamp}_{uuid.uuid4().hex[:8]}{extension}"
         filepath = os.path.join(GENERATED_IMAGES_DIR, filename)
-        with open(filepath, 'wb') as f:
-            f.write(image_bytes)
-        print(f"✅ Image saved: {filepath}")
-        return filepath
+        digest = hashlib.sha256()
+        size = 0
+        tmp = tempfile.NamedTemporaryFile(dir=GENERATED_IMAGES_DIR, prefix=f".{prefix}_", suffix=".part", delete=False)
+        try:
+            with tmp:
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    if chunk:
+                        tmp.write(chunk)
+                        digest.update(chunk)
+                        size += len(chunk)
+            if size == 0:
+                raise ValueError("Worker returned an empty image")
+            os.replace(tmp.name, filepath)
+        except Exception:
+            if os.path.exists(tmp.name):
+                os.remove(tmp.name)
+            raise
+        print(f"✅ Image saved: {filepath} ({size} bytes)")
+        return {
+            "path": filepath,
+            "sha256": digest.hexdigest(),
+            "size": size,
+            "content_type": content_type if content_type in CONTENT_TYPE_EXTENSIONS else "image/jpeg"
+        }
+
+    def _file_info(self, filepath):
+        """Hash an already-saved file in chunks"""
+        digest = hashlib.sha256()
+        size = 0
+        with open(filepath, 'rb') as f:
+            for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b''):
+                digest.update(chunk)
+                size += len(chunk)
+        return {
+            "path": filepath,
+            "sha256": digest.hexdigest(),
+            "size": size,
+            "content_type": mimetypes.guess_type(filepath)[0] or "image/png"
+        }
 
     def _generate_placeholder(self, prompt):
         """Fallback placeholder (rarely used now)."""
@@ -64,8 +133,120 @@ class FreeImageGenerator:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"placeholder_{timestamp}_{uuid.uuid4().hex[:8]}.png"
         filepath = os.path.join(GENERATED_IMAGES_DIR, filename)
-        img.save(filepath)
+        img.save(filepath, optimize=True)
         return filepath
 
+# ============ POST-PROCESSING ============
+def _variant_formats():
+    """Formats this Pillow build can write, best first"""
+    Image.init()
+    formats = []
+    if "AVIF" in Image.SAVE:
+        formats.append("avif")
+    if "WEBP" in Image.SAVE:
+        formats.append("webp")
+    return formats
+
+def _save_variant(img, filename, fmt):
+    filepath = os.path.join(VARIANTS_DIR, filename)
+    tmp_path = filepath + ".tmp"
+    img.save(tmp_path, format=fmt.upper(), quality=VARIANT_QUALITY)
+    os.replace(tmp_path, filepath)
+    return filename
+
+def build_variants(image_path):
+    """Write compressed copies and thumbnails of image_path. Runs in a worker process."""
+    stem = os.path.splitext(os.path.basename(image_path))[0]
+    formats = _variant_formats()
+    variants = {"formats": {}, "thumbnails": {}}
+    with Image.open(image_path) as img:
+        img = img.convert("RGB")
+        for fmt in formats:
+            variants["formats"][fmt] = _save_variant(img, f"{stem}.{fmt}", fmt)
+        for size in THUMBNAIL_SIZES:
+            thumb = img.copy()
+            thumb.thumbnail((size, size))
+            sized = variants["thumbnails"][str(size)] = {}
+            for fmt in formats + ["jpeg"]:
+                sized[fmt] = _save_variant(thumb, f"{stem}_{size}.{fmt}", fmt)
+    return variants
+
+def _get_pool():
+    global _postprocess_pool
+    with _pool_lock:
+        if _postprocess_pool is None:
+            _postprocess_pool = ProcessPoolExecutor(max_workers=POSTPROCESS_WORKERS)
+        return _postprocess_pool
+
+def postprocess_image(image_path, callback=None):
+    """Queue variant generation for image_path; callback(variants) runs when done."""
+    def _done(future):
+        try:
+            variants = future.result()
+        except Exception as e:
+            print(f"⚠️ Post-processing failed for {image_path}: {e}", flush=True)
+            return
+        print(f"✅ Variants ready: {os.path.basename(image_path)}", flush=True)
+        if callback:
+            callback(variants)
+    try:
+        _get_pool().submit(build_variants, image_path).add_done_callback(_done)
+    except Exception as e:
+        print(f"⚠️ Could not queue post-processing: {e}", flush=True)
+
+def _accepted_formats(accept_header):
+    """Image formats from an Accept header, ignoring ones with q=0"""
+    accepted = set()
+    for part in (accept_header or "").split(","):
+        fields = [f.strip() for f in part.split(";")]
+        if any(f.replace(" ", "") in ("q=0", "q=0.0") for f in fields[1:]):
+            continue
+        if fields[0].startswith("image/"):
+            accepted.add(fields[0][len("image/"):])
+    return accepted
+
+def find_variant(filename, accept_header, size=None):
+    """
+    Pick the best file to serve for filename.
+    Returns (path, mimetype) of an AVIF/WebP copy or thumbnail the client accepts,
+    falling back to the original file.
+    """
+    stem = os.path.splitext(filename)[0]
+    accepted = _accepted_formats(accept_header)
+    candidates = [fmt for fmt in ("avif", "webp") if fmt in accepted]
+    if size is not None:
+        candidates.append("jpeg")
+        for fmt in candidates:
+            path = os.path.join(VARIANTS_DIR, f"{stem}_{size}.{fmt}")
+            if os.path.exists(path):
+                return path, f"image/{fmt}"
+    else:
+        for fmt in candidates:
+            path = os.path.join(VARIANTS_DIR, f"{stem}.{fmt}")
+            if os.path.exists(path):
+                return path, f"image/{fmt}"
+    path = os.path.join(GENERATED_IMAGES_DIR, filename)
+    return path, mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+def variant_paths(image_path):
+    """Every path build_variants may write for image_path (no directory scan)"""
+    stem = os.path.splitext(os.path.basename(image_path))[0]
+    formats = ("avif", "webp")
+    paths = [os.path.join(VARIANTS_DIR, f"{stem}.{fmt}") for fmt in formats]
+    for size in THUMBNAIL_SIZES:
+        for fmt in formats + ("jpeg",):
+            paths.append(os.path.join(VARIANTS_DIR, f"{stem}_{size}.{fmt}"))
+    return paths
+
+def remove_variants(image_path):
+    """Delete every post-processed copy of image_path"""
+    for path in variant_paths(image_path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"⚠️ Could not delete variant {path}: {e}", flush=True)
+
 # Keep the class name for compatibility
 FreeImageGenerator = FreeImageGenerator
\ No newline at end of file
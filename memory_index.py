@@ -0,0 +1,124 @@
+import os
+import re
+import json
+import zlib
+import threading
+import numpy as np
+
+# Hashed bag-of-words vectors: no model download, fast on CPU
+VECTOR_DIM = 1024
+TOP_K = 4            # relevant older messages pulled back into the prompt
+RECENT_TURNS = 4     # latest messages always included
+MIN_SIMILARITY = 0.15
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "were", "be", "to", "of", "and", "or", "in", "on",
+    "at", "for", "with", "it", "this", "that", "i", "you", "me", "my", "your", "we", "do",
+    "does", "did", "what", "how", "can", "could", "please", "tell", "about", "jarvis"
+}
+
+def embed(text):
+    """Map text to an L2-normalised hashed bag-of-words vector"""
+    vector = np.zeros(VECTOR_DIM, dtype=np.float32)
+    for token in _TOKEN_RE.findall(text.lower()):
+        if token in STOPWORDS or len(token) < 2:
+            continue
+        # crc32 is stable across runs (unlike hash()), so saved vectors stay valid
+        h = zlib.crc32(token.encode("utf-8"))
+        vector[h % VECTOR_DIM] += 1.0 if (h >> 16) & 1 else -1.0
+    norm = np.linalg.norm(vector)
+    if norm > 0:
+        vector /= norm
+    return vector
+
+
+class ConversationMemory:
+    """
+    Stores every message with its vector and rebuilds a short prompt history on demand.
+    With a path, messages are appended to a JSONL file (one line per message) and
+    re-embedded on load, so persisting a turn never rewrites the whole history.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.lock = threading.Lock()
+        self.messages = []
+        self.vectors = np.zeros((0, VECTOR_DIM), dtype=np.float32)
+        self._count = 0
+        if path:
+            self.load()
+
+    def __len__(self):
+        return self._count
+
+    def add(self, role, content):
+        vector = embed(content)
+        with self.lock:
+            self._append(vector, role, content)
+            if self.path:
+                try:
+                    with open(self.path, "a", encoding="utf-8") as f:
+                        f.write(json.dumps({"role": role, "content": content}) + "\n")
+                except Exception as e:
+                    print(f"⚠️ Could not save conversation memory: {e}", flush=True)
+
+    def _append(self, vector, role, content):
+        if self._count == len(self.vectors):
+            # Grow by doubling so adds stay cheap
+            grown = np.zeros((max(16, len(self.vectors) * 2), VECTOR_DIM), dtype=np.float32)
+            grown[:self._count] = self.vectors[:self._count]
+            self.vectors = grown
+        self.vectors[self._count] = vector
+        self.messages.append({"role": role, "content": content})
+        self._count += 1
+
+    def build_context(self, query, top_k=TOP_K, recent=RECENT_TURNS):
+        """
+        Return the history to send with query: the top_k most similar older
+        messages (each with its question/answer partner) followed by the last
+        `recent` messages, in chronological order.
+        """
+        with self.lock:
+            count = self._count
+            recent_start = max(0, count - recent)
+            selected = set(range(recent_start, count))
+            if recent_start > 0 and top_k > 0:
+                scores = self.vectors[:recent_start] @ embed(query)
+                for i in np.argsort(scores)[::-1][:top_k]:
+                    if scores[i] < MIN_SIMILARITY:
+                        break
+                    i = int(i)
+                    selected.add(i)
+                    partner = i + 1 if self.messages[i]["role"] == "user" else i - 1
+                    if 0 <= partner < count:
+                        selected.add(partner)
+            return [dict(self.messages[i]) for i in sorted(selected)]
+
+    def clear(self):
+        with self.lock:
+            self.messages = []
+            self.vectors = np.zeros((0, VECTOR_DIM), dtype=np.float32)
+            self._count = 0
+            if self.path and os.path.exists(self.path):
+                try:
+                    os.remove(self.path)
+                except OSError as e:
+                    print(f"⚠️ Could not clear conversation memory: {e}", flush=True)
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                lines = f.readlines()
+            with self.lock:
+                for line in lines:
+                    try:
+                        message = json.loads(line)
+                    except ValueError:
+                        continue  # partial last line after a crash
+                    self._append(embed(message["content"]), message["role"], message["content"])
+            print(f"✅ Loaded conversation memory: {self._count} messages", flush=True)
+        except Exception as e:
+            print(f"⚠️ Could not load conversation memory: {e}", flush=True)
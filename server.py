@@ -1,4 +1,4 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, request, jsonify, send_file, Response, stream_with_context
 from flask_cors import CORS
 import subprocess
 import os
@@ -9,6 +9,12 @@ import base64
 from io import BytesIO
 import threading
 import traceback
+import json
+import queue
+import hashlib
+import mimetypes
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 # ===== FORCE RELOAD of gemini_ai.py =====
 if 'gemini_ai' in sys.modules:
@@ -16,6 +22,7 @@ if 'gemini_ai' in sys.modules:
 
 import gemini_ai
 import img_gen
+import memory_index
 
 print("=" * 60)
 print("🚀 MAN-I Server Starting...")
@@ -28,15 +35,219 @@ CORS(app, origins=["http://localhost:5173", "http://localhost:5000", "http://loc
 
 assistant_process = None
 active_sessions = {}
+session_memories = OrderedDict()  # session_id -> ConversationMemory, least recently used first
 image_storage = {}
 session_lock = threading.Lock()
 
+# Per-session conversation memory: kept on disk, only recently used sessions stay loaded
+SESSION_MEMORY_DIR = os.path.join(os.getcwd(), 'session_memory')
+os.makedirs(SESSION_MEMORY_DIR, exist_ok=True)
+MAX_LOADED_MEMORIES = 200
+MEMORY_IDLE_SECONDS = 3600
+SESSION_MEMORY_TTL_SECONDS = 30 * 24 * 3600    # delete session memory files untouched this long
+
+# Batch chat limits
+BATCH_MAX_ITEMS = 500
+BATCH_MAX_WORKERS = 8
+
 # Create generated_images directory if it doesn't exist
 GENERATED_IMAGES_DIR = os.path.join(os.getcwd(), 'generated_images')
 if not os.path.exists(GENERATED_IMAGES_DIR):
     os.makedirs(GENERATED_IMAGES_DIR)
     print(f"✅ Created images directory: {GENERATED_IMAGES_DIR}")
 
+# ============ IMAGE STORAGE HOUSEKEEPING ============
+# The image index is persisted so files written before a restart stay tracked.
+# It lives outside generated_images so /api/images can never serve it.
+IMAGE_INDEX_PATH = os.path.join(os.getcwd(), 'image_index.json')
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.webp')
+IMAGE_USER_QUOTA = 50                          # images kept per user
+IMAGE_DISK_QUOTA_BYTES = 2 * 1024 ** 3         # all images + variants
+IMAGE_TTL_SECONDS = 30 * 24 * 3600             # delete images older than this
+ORPHAN_GRACE_SECONDS = 600                     # leave fresh unindexed files alone (may be mid-request)
+JANITOR_INTERVAL = 600
+JANITOR_BATCH_SIZE = 100
+JANITOR_BATCH_PAUSE = 0.05
+
+index_lock = threading.Lock()
+janitor_wakeup = threading.Event()
+
+def _save_image_index():
+    """Write image_storage to disk"""
+    # Snapshot and write under index_lock so an older snapshot can't be written last
+    with index_lock:
+        with session_lock:
+            snapshot = {
+                user_id: [dict(img) for img in images]
+                for user_id, images in image_storage.items()
+            }
+        tmp_path = IMAGE_INDEX_PATH + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f)
+            os.replace(tmp_path, IMAGE_INDEX_PATH)
+        except Exception as e:
+            print(f"⚠️ Could not save image index: {e}", flush=True)
+
+def _load_image_index():
+    if not os.path.exists(IMAGE_INDEX_PATH):
+        return
+    try:
+        with open(IMAGE_INDEX_PATH, 'r', encoding='utf-8') as f:
+            loaded = json.load(f)
+        with session_lock:
+            for user_id, images in loaded.items():
+                image_storage.setdefault(user_id, []).extend(images)
+        print(f"✅ Loaded image index: {sum(len(imgs) for imgs in loaded.values())} images", flush=True)
+    except Exception as e:
+        print(f"⚠️ Could not load image index: {e}", flush=True)
+
+def _image_files(img):
+    """Original file plus every recorded variant of an image"""
+    paths = [img['path']]
+    variants = img.get('variants')
+    if not variants:
+        # Post-processing may still be running; use the names it will write
+        return paths + img_gen.variant_paths(img['path'])
+    for filename in (variants.get('formats') or {}).values():
+        paths.append(os.path.join(img_gen.VARIANTS_DIR, filename))
+    for sized in (variants.get('thumbnails') or {}).values():
+        for filename in sized.values():
+            paths.append(os.path.join(img_gen.VARIANTS_DIR, filename))
+    return paths
+
+def _image_size(img):
+    total = 0
+    for path in _image_files(img):
+        try:
+            total += os.path.getsize(path)
+        except OSError:
+            pass
+    return total
+
+def _delete_in_batches(paths):
+    """Remove files a batch at a time so the janitor never hogs the disk"""
+    for start in range(0, len(paths), JANITOR_BATCH_SIZE):
+        for path in paths[start:start + JANITOR_BATCH_SIZE]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"⚠️ Could not delete {path}: {e}", flush=True)
+        time.sleep(JANITOR_BATCH_PAUSE)
+
+def _reconcile_images():
+    """Drop index entries whose file is gone and delete files the index doesn't know"""
+    with session_lock:
+        for user_id in list(image_storage):
+            image_storage[user_id] = [img for img in image_storage[user_id] if os.path.exists(img['path'])]
+            if not image_storage[user_id]:
+                del image_storage[user_id]
+        indexed = set()
+        for images in image_storage.values():
+            for img in images:
+                indexed.update(os.path.normcase(os.path.abspath(p)) for p in _image_files(img))
+    now = time.time()
+    orphans = []
+    for directory in (GENERATED_IMAGES_DIR, img_gen.VARIANTS_DIR):
+        for f in os.listdir(directory):
+            path = os.path.join(directory, f)
+            if not os.path.isfile(path):
+                continue
+            if os.path.normcase(os.path.abspath(path)) in indexed:
+                continue
+            try:
+                if now - os.path.getmtime(path) < ORPHAN_GRACE_SECONDS:
+                    continue
+            except OSError:
+                continue
+            orphans.append(path)
+    if orphans:
+        print(f"🧹 Removing {len(orphans)} orphaned image files", flush=True)
+        _delete_in_batches(orphans)
+
+def _collect_garbage():
+    """Apply TTL, per-user quota and global disk quota; returns number of images removed"""
+    cutoff = datetime.now().timestamp() - IMAGE_TTL_SECONDS
+    victims = []
+    with session_lock:
+        for user_id in list(image_storage):
+            kept = []
+            for img in image_storage[user_id]:
+                try:
+                    expired = datetime.fromisoformat(img['timestamp']).timestamp() < cutoff
+                except (KeyError, ValueError):
+                    expired = False
+                (victims if expired else kept).append(img)
+            if len(kept) > IMAGE_USER_QUOTA:
+                victims.extend(kept[:-IMAGE_USER_QUOTA])
+                kept = kept[-IMAGE_USER_QUOTA:]
+            image_storage[user_id] = kept
+        remaining = [img for images in image_storage.values() for img in images]
+    sizes = [(img, _image_size(img)) for img in remaining]
+    total = sum(size for _, size in sizes)
+    if total > IMAGE_DISK_QUOTA_BYTES:
+        over_quota = set()
+        for img, size in sorted(sizes, key=lambda item: item[0].get('timestamp', '')):
+            if total <= IMAGE_DISK_QUOTA_BYTES:
+                break
+            over_quota.add(id(img))
+            total -= size
+        with session_lock:
+            for user_id in list(image_storage):
+                kept = []
+                for img in image_storage[user_id]:
+                    (victims if id(img) in over_quota else kept).append(img)
+                image_storage[user_id] = kept
+    if victims:
+        _delete_in_batches([path for img in victims for path in _image_files(img)])
+        _save_image_index()
+        print(f"🧹 Janitor removed {len(victims)} images", flush=True)
+    return len(victims)
+
+def _sweep_session_memories():
+    """Delete session memory files that haven't been written to within SESSION_MEMORY_TTL_SECONDS"""
+    cutoff = time.time() - SESSION_MEMORY_TTL_SECONDS
+    expired = []
+    for f in os.listdir(SESSION_MEMORY_DIR):
+        path = os.path.join(SESSION_MEMORY_DIR, f)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                expired.append(path)
+        except OSError:
+            continue
+    if not expired:
+        return
+    expired_set = set(expired)
+    with session_lock:
+        for session_id in [sid for sid, (memory, _) in session_memories.items() if memory.path in expired_set]:
+            del session_memories[session_id]
+    _delete_in_batches(expired)
+    print(f"🧹 Removed {len(expired)} expired session memories", flush=True)
+
+def _image_janitor():
+    try:
+        _reconcile_images()
+        _save_image_index()
+    except Exception as e:
+        print(f"⚠️ Image reconcile failed: {e}", flush=True)
+    while True:
+        try:
+            _collect_garbage()
+        except Exception as e:
+            print(f"⚠️ Image janitor error: {e}", flush=True)
+        try:
+            _sweep_session_memories()
+        except Exception as e:
+            print(f"⚠️ Session memory sweep error: {e}", flush=True)
+        janitor_wakeup.wait(JANITOR_INTERVAL)
+        janitor_wakeup.clear()
+
+def start_image_janitor():
+    _load_image_index()
+    threading.Thread(target=_image_janitor, name="image-janitor", daemon=True).start()
+
 # ============ MAN-I PROCESS MANAGEMENT ============
 @app.route('/start', methods=['POST'])
 def start_assistant():
@@ -85,6 +296,31 @@ def get_status():
         return jsonify({"status": "inactive"})
 
 # ============ CHAT ENDPOINT ============
+def _session_memory_path(session_id):
+    filename = hashlib.sha1(str(session_id).encode('utf-8')).hexdigest() + '.jsonl'
+    return os.path.join(SESSION_MEMORY_DIR, filename)
+
+def _session_memory(session_id):
+    """Loaded memory for a session; idle or least recently used ones are dropped (they stay on disk)"""
+    now = time.time()
+    with session_lock:
+        entry = session_memories.pop(session_id, None)
+        while session_memories:
+            oldest_id, (_, last_used) = next(iter(session_memories.items()))
+            if len(session_memories) < MAX_LOADED_MEMORIES and now - last_used < MEMORY_IDLE_SECONDS:
+                break
+            del session_memories[oldest_id]
+    if entry is None:
+        memory = memory_index.ConversationMemory(_session_memory_path(session_id))
+    else:
+        memory = entry[0]
+    with session_lock:
+        # Another request may have loaded it meanwhile; keep a single instance
+        if session_id in session_memories:
+            memory = session_memories.pop(session_id)[0]
+        session_memories[session_id] = (memory, now)
+    return memory
+
 @app.route('/api/chat/text', methods=['POST'])
 def chat_text():
     try:
@@ -99,10 +335,14 @@ def chat_text():
         with session_lock:
             if session_id not in active_sessions:
                 active_sessions[session_id] = []
-            chat_history = active_sessions[session_id]
-            chat_history.append({"role": "user", "content": message})
+            active_sessions[session_id].append({"role": "user", "content": message})
+        memory = _session_memory(session_id)
         try:
-            response_text = gemini_ai.send_request(chat_history)
+            # Only the relevant and most recent turns go into the prompt
+            chat_history = memory.build_context(message) + [{"role": "user", "content": message}]
+            response_text = gemini_ai.send_request(chat_history, raise_errors=True)
+            memory.add("user", message)
+            memory.add("assistant", response_text)
             with session_lock:
                 if session_id in active_sessions:
                     active_sessions[session_id].append({"role": "assistant", "content": response_text})
@@ -130,7 +370,105 @@ def chat_text():
         traceback.print_exc()
         return jsonify({"success": False, "response": "An error occurred.", "source": "error"})
 
+# ============ BATCH CHAT ENDPOINT ============
+def _run_batch_chain(items, results):
+    """Run items in order (items sharing a session must see each other's turns)"""
+    for index, message, session_id in items:
+        result = {"index": index, "sessionId": session_id}
+        try:
+            if session_id is not None:
+                with session_lock:
+                    if session_id not in active_sessions:
+                        active_sessions[session_id] = []
+                    active_sessions[session_id].append({"role": "user", "content": message})
+                memory = _session_memory(session_id)
+                chat_history = memory.build_context(message) + [{"role": "user", "content": message}]
+            else:
+                chat_history = [{"role": "user", "content": message}]
+            response_text = gemini_ai.send_request(chat_history, raise_errors=True)
+            if session_id is not None:
+                memory.add("user", message)
+                memory.add("assistant", response_text)
+                with session_lock:
+                    if session_id in active_sessions:
+                        active_sessions[session_id].append({"role": "assistant", "content": response_text})
+            result.update({"success": True, "response": response_text, "source": "gemini"})
+        except Exception as e:
+            if session_id is not None:
+                with session_lock:
+                    history = active_sessions.get(session_id)
+                    if history and history[-1] == {"role": "user", "content": message}:
+                        history.pop()
+            result.update({"success": False, "error": str(e)[:200]})
+        result["timestamp"] = datetime.now().isoformat()
+        results.put(result)
+
+@app.route('/api/chat/batch', methods=['POST'])
+def chat_batch():
+    try:
+        data = request.json or {}
+        prompts = data.get('prompts', [])
+        if not isinstance(prompts, list) or not prompts:
+            return jsonify({"success": False, "error": "No prompts provided"}), 400
+        if len(prompts) > BATCH_MAX_ITEMS:
+            return jsonify({"success": False, "error": f"Too many prompts (max {BATCH_MAX_ITEMS})"}), 400
+        workers = min(int(data.get('concurrency', BATCH_MAX_WORKERS)), BATCH_MAX_WORKERS)
+        workers = max(workers, 1)
+
+        # Items without a session run independently; items sharing a session run in order
+        chains = {}
+        invalid = []
+        for index, item in enumerate(prompts):
+            if isinstance(item, str):
+                message, session_id = item, None
+            elif isinstance(item, dict):
+                message, session_id = item.get('message', ''), item.get('sessionId')
+            else:
+                message, session_id = '', None
+            if not message:
+                invalid.append(index)
+                continue
+            key = ('session', session_id) if session_id is not None else ('item', index)
+            chains.setdefault(key, []).append((index, message, session_id))
+
+        print(f"\n📦 Batch chat request: {len(prompts)} prompts, {workers} workers", flush=True)
+    except Exception as e:
+        print(f"❌ Batch chat error: {e}", flush=True)
+        traceback.print_exc()
+        return jsonify({"success": False, "error": str(e)}), 400
+
+    def generate():
+        results = queue.Queue()
+        for index in invalid:
+            yield json.dumps({"index": index, "success": False, "error": "No message provided"}) + "\n"
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            for items in chains.values():
+                executor.submit(_run_batch_chain, items, results)
+            remaining = sum(len(items) for items in chains.values())
+            while remaining:
+                yield json.dumps(results.get()) + "\n"
+                remaining -= 1
+        finally:
+            # Client disconnects stop queued work; in-flight calls finish in the background
+            executor.shutdown(wait=False, cancel_futures=True)
+        print(f"✅ Batch chat finished: {len(prompts)} prompts", flush=True)
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 # ============ IMAGE GENERATION ENDPOINT ============
+def _file_data_url(path, content_type):
+    """Build a data URL from the file on disk, encoding it chunk by chunk (never kept in image_storage)"""
+    chunk_size = 3 * 64 * 1024  # multiple of 3 so chunks encode without padding
+    parts = []
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                parts.append(base64.b64encode(chunk).decode('ascii'))
+    except OSError:
+        return None
+    return f"data:{content_type};base64,{''.join(parts)}"
+
 @app.route('/api/generate-image', methods=['POST'])
 def generate_image_api():
     try:
@@ -142,17 +480,15 @@ def generate_image_api():
         print(f"\n🎨 Generating image: '{prompt[:50]}...'", flush=True)
         try:
             generator = img_gen.FreeImageGenerator()
-            image_path = generator.generate_image(prompt)
+            result = generator.generate_image_file(prompt)
+            image_path = result["path"]
         except Exception as img_error:
             print(f"⚠️ Image generation error: {img_error}", flush=True)
             traceback.print_exc()
+            result = None
             image_path = None
         if not image_path or not os.path.exists(image_path):
             return jsonify({"success": False, "error": "Image generation failed"})
-        with open(image_path, 'rb') as f:
-            image_data = f.read()
-        image_base64 = base64.b64encode(image_data).decode('utf-8')
-        data_url = f"data:image/png;base64,{image_base64}"
         image_id = f"img_{int(time.time())}_{user_id}"
         filename = os.path.basename(image_path)
         with session_lock:
@@ -164,17 +500,23 @@ def generate_image_api():
                 "path": image_path,
                 "filename": filename,
                 "timestamp": datetime.now().isoformat(),
-                "dataUrl": data_url
+                "contentType": result["content_type"],
+                "sha256": result["sha256"],
+                "size": result["size"]
             }
             image_storage[user_id].append(image_info)
-            if len(image_storage[user_id]) > 50:
-                for old_img in image_storage[user_id][:-50]:
-                    if os.path.exists(old_img['path']):
-                        try:
-                            os.remove(old_img['path'])
-                        except:
-                            pass
-                image_storage[user_id] = image_storage[user_id][-50:]
+            over_quota = len(image_storage[user_id]) > IMAGE_USER_QUOTA
+        _save_image_index()
+        if over_quota:
+            # Old images are removed by the janitor, off the request path
+            janitor_wakeup.set()
+
+        def _record_variants(variants):
+            with session_lock:
+                image_info["variants"] = variants
+            _save_image_index()
+        img_gen.postprocess_image(image_path, _record_variants)
+
         image_url = f"http://localhost:5001/api/images/{filename}"
         print(f"✅ Image saved: {image_path}", flush=True)
         print(f"✅ Image URL: {image_url}", flush=True)
@@ -182,7 +524,7 @@ def generate_image_api():
             "success": True,
             "imageId": image_id,
             "imageUrl": image_url,
-            "dataUrl": data_url,
+            "dataUrl": _file_data_url(image_path, result["content_type"]),
             "prompt": prompt,
             "timestamp": datetime.now().isoformat(),
             "filename": filename,
@@ -199,11 +541,18 @@ def serve_image(filename):
     try:
         if '..' in filename or '/' in filename or '\\' in filename:
             return jsonify({"success": False, "error": "Invalid filename"}), 400
-        file_path = os.path.join(GENERATED_IMAGES_DIR, filename)
-        if not os.path.exists(file_path):
-            print(f"❌ Image not found: {file_path}", flush=True)
+        if not filename.lower().endswith(IMAGE_EXTENSIONS):
+            return jsonify({"success": False, "error": "Invalid filename"}), 400
+        size = request.args.get('size')
+        if size is not None and size not in [str(s) for s in img_gen.THUMBNAIL_SIZES]:
+            return jsonify({"success": False, "error": "Invalid size"}), 400
+        if not os.path.exists(os.path.join(GENERATED_IMAGES_DIR, filename)):
+            print(f"❌ Image not found: {filename}", flush=True)
             return jsonify({"success": False, "error": "Image not found"}), 404
-        return send_file(file_path, mimetype='image/png')
+        file_path, mimetype = img_gen.find_variant(filename, request.headers.get('Accept', ''), size)
+        response = send_file(file_path, mimetype=mimetype)
+        response.headers['Vary'] = 'Accept'
+        return response
     except Exception as e:
         print(f"❌ Serve image error: {e}", flush=True)
         return jsonify({"success": False, "error": str(e)}), 500
@@ -214,7 +563,7 @@ def list_images():
     try:
         files = []
         for f in os.listdir(GENERATED_IMAGES_DIR):
-            if f.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.webp')):
+            if f.lower().endswith(IMAGE_EXTENSIONS):
                 file_path = os.path.join(GENERATED_IMAGES_DIR, f)
                 stat = os.stat(file_path)
                 files.append({
@@ -234,21 +583,21 @@ def list_images():
 def get_user_images(user_id):
     try:
         with session_lock:
-            if user_id in image_storage:
-                images = image_storage[user_id]
-                image_list = []
-                for img in reversed(images):
-                    image_list.append({
-                        "id": img['id'],
-                        "prompt": img['prompt'],
-                        "timestamp": img['timestamp'],
-                        "imageUrl": f"http://localhost:5001/api/images/{img['filename']}",
-                        "dataUrl": img.get('dataUrl'),
-                        "filename": img['filename']
-                    })
-                return jsonify({"success": True, "images": image_list, "count": len(images)})
-            else:
-                return jsonify({"success": True, "images": [], "count": 0})
+            images = [dict(img) for img in image_storage.get(user_id, [])]
+        # Data URLs are read from disk outside session_lock
+        image_list = []
+        for img in reversed(images):
+            content_type = img.get('contentType') or mimetypes.guess_type(img['filename'])[0] or 'image/png'
+            image_list.append({
+                "id": img['id'],
+                "prompt": img['prompt'],
+                "timestamp": img['timestamp'],
+                "imageUrl": f"http://localhost:5001/api/images/{img['filename']}",
+                "dataUrl": _file_data_url(img['path'], content_type),
+                "filename": img['filename'],
+                "variants": img.get('variants')
+            })
+        return jsonify({"success": True, "images": image_list, "count": len(images)})
     except Exception as e:
         print(f"❌ Get user images error: {e}", flush=True)
         return jsonify({"success": False, "error": str(e)})
@@ -259,18 +608,24 @@ def delete_image(image_id):
     try:
         data = request.json
         user_id = data.get('userId', 'anonymous')
+        deleted = None
         with session_lock:
             if user_id in image_storage:
                 for i, img in enumerate(image_storage[user_id]):
                     if img['id'] == image_id:
-                        if os.path.exists(img['path']):
-                            try:
-                                os.remove(img['path'])
-                                print(f"✅ Deleted file: {img['path']}", flush=True)
-                            except Exception as e:
-                                print(f"⚠️ Could not delete file: {e}", flush=True)
-                        del image_storage[user_id][i]
-                        return jsonify({"success": True, "message": "Image deleted"})
+                        deleted = image_storage[user_id].pop(i)
+                        break
+        if deleted:
+            # Files are removed outside session_lock so chat requests aren't blocked
+            if os.path.exists(deleted['path']):
+                try:
+                    os.remove(deleted['path'])
+                    print(f"✅ Deleted file: {deleted['path']}", flush=True)
+                except Exception as e:
+                    print(f"⚠️ Could not delete file: {e}", flush=True)
+            img_gen.remove_variants(deleted['path'])
+            _save_image_index()
+            return jsonify({"success": True, "message": "Image deleted"})
         return jsonify({"success": False, "error": "Image not found"}), 404
     except Exception as e:
         print(f"❌ Delete image error: {e}", flush=True)
@@ -282,6 +637,13 @@ def clear_chat(session_id):
     with session_lock:
         if session_id in active_sessions:
             active_sessions[session_id] = []
+        session_memories.pop(session_id, None)
+    try:
+        os.remove(_session_memory_path(session_id))
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"⚠️ Could not clear session memory: {e}", flush=True)
     return jsonify({"success": True, "message": "Chat cleared"})
 
 # ============ GET CHAT HISTORY ============
@@ -304,9 +666,17 @@ def health_check():
         "status": "healthy",
         "service": "MAN-I AI Server",
         "gemini_model": gemini_ai.MODEL_NAME,
+        "gemini_models": gemini_ai.MODEL_CANDIDATES,
+        "model_stats": gemini_ai.get_model_stats(),
         "active_sessions": len(active_sessions),
+        "loaded_session_memories": len(session_memories),
         "total_images": sum(len(imgs) for imgs in image_storage.values()),
         "images_directory": GENERATED_IMAGES_DIR,
+        "image_quotas": {
+            "per_user": IMAGE_USER_QUOTA,
+            "disk_bytes": IMAGE_DISK_QUOTA_BYTES,
+            "ttl_seconds": IMAGE_TTL_SECONDS
+        },
         "timestamp": datetime.now().isoformat()
     })
 
@@ -323,8 +693,9 @@ def home():
             "/start - Start MAN-I",
             "/stop - Stop MAN-I",
             "/api/chat/text - Chat endpoint",
+            "/api/chat/batch - Batch chat (NDJSON stream)",
             "/api/generate-image - Generate image",
-            "/api/images/<filename> - Get image file",
+            "/api/images/<filename> - Get image file (?size=128|256|512 for thumbnails)",
             "/api/images/list - List all images",
             "/api/get-user-images/<user_id> - Get user images",
             "/api/delete-image/<image_id> - Delete image",
@@ -333,6 +704,9 @@ def home():
     })
 
 if __name__ == '__main__':
+    # Only in the real server process: image post-processing workers started
+    # with spawn (Windows/macOS) re-import this file as __mp_main__
+    start_image_janitor()
     print("=" * 60)
     print("🚀 MAN-I Server running on http://localhost:5001")
     print("=" * 60)
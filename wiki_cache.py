@@ -0,0 +1,174 @@
+import re
+import sys
+import time
+import sqlite3
+import threading
+import wikipedia
+
+CACHE_PATH = "wiki_cache.db"
+CACHE_TTL_SECONDS = 7 * 24 * 3600   # refetch summaries older than this
+SUMMARY_SENTENCES = 2
+
+_PUNCT_RE = re.compile(r"[^a-z0-9 ]+")
+_DIGITS_RE = re.compile(r"\d+")
+_ROMAN_RE = re.compile(r"^m{0,3}(cm|cd|d?c{0,3})(xc|xl|l?x{0,3})(ix|iv|v?i{0,3})$")
+# Question prefixes only; articles stay because they can be part of a title ("The Who")
+_LEADING_WORDS = ("who is ", "who was ", "what is ", "what are ", "what was ", "tell me about ")
+
+def normalize_title(text):
+    """Cache key for a query: lowercase, no punctuation, no leading question words"""
+    key = _PUNCT_RE.sub(" ", text.lower())
+    key = " ".join(key.split())
+    stripped = True
+    while stripped:
+        stripped = False
+        for word in _LEADING_WORDS:
+            if key.startswith(word):
+                key = key[len(word):]
+                stripped = True
+    return key
+
+def _compact(key):
+    return key.replace(" ", "")
+
+def _numbers(key):
+    """Digits and roman numerals in a key, e.g. 'world war ii' -> ['ii']"""
+    numbers = _DIGITS_RE.findall(key)
+    numbers.extend(word for word in key.split() if _ROMAN_RE.match(word))
+    return numbers
+
+def is_safe_match(key, candidate):
+    """
+    True when two normalised titles name the same article: they differ only in
+    spacing ('new york' / 'newyork') and carry the same numbers. Spelling
+    variants are never matched, since near-identical titles are often
+    different articles ('colombia' / 'columbia', 'world war i' / 'world war ii').
+
+    >>> is_safe_match(normalize_title("World War II"), normalize_title("World War I"))
+    False
+    >>> is_safe_match("colombia", "columbia"), is_safe_match("carolina", "caroline")
+    (False, False)
+    >>> is_safe_match("paris", "pari"), is_safe_match("news", "new")
+    (False, False)
+    >>> normalize_title("The Who") == normalize_title("WHO")
+    False
+    >>> is_safe_match("new york", "newyork")
+    True
+    """
+    if key == candidate:
+        return True
+    return _compact(key) == _compact(candidate) and _numbers(key) == _numbers(candidate)
+
+
+class WikiCache:
+    """Persistent Wikipedia summary cache with spacing-tolerant title matching and offline fallback."""
+
+    def __init__(self, path=CACHE_PATH, ttl=CACHE_TTL_SECONDS):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS summaries ("
+            "key TEXT, sentences INTEGER, title TEXT, summary TEXT, fetched_at REAL, "
+            "PRIMARY KEY (key, sentences))"
+        )
+        self.conn.commit()
+        # compact key (no spaces) -> cached keys, for spacing-tolerant lookups
+        self.compact_keys = {}
+        for (key,) in self.conn.execute("SELECT DISTINCT key FROM summaries"):
+            self.compact_keys.setdefault(_compact(key), []).append(key)
+
+    def get(self, query, sentences=SUMMARY_SENTENCES, allow_stale=False):
+        """Cached summary for query (exact or spacing-only title match), or None"""
+        key = normalize_title(query)
+        if not key:
+            return None
+        sql = "SELECT summary, fetched_at FROM summaries WHERE key = ? AND sentences = ?"
+        with self.lock:
+            row = self.conn.execute(sql, (key, sentences)).fetchone()
+            if row is None:
+                for candidate in self.compact_keys.get(_compact(key), []):
+                    if candidate != key and is_safe_match(key, candidate):
+                        row = self.conn.execute(sql, (candidate, sentences)).fetchone()
+                        if row is not None:
+                            break
+        if row is None:
+            return None
+        summary, fetched_at = row
+        if not allow_stale and time.time() - fetched_at > self.ttl:
+            return None
+        return summary
+
+    def put(self, query, title, summary, sentences=SUMMARY_SENTENCES):
+        key = normalize_title(query)
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO summaries (key, sentences, title, summary, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, sentences, title, summary, time.time())
+            )
+            self.conn.commit()
+            same_compact = self.compact_keys.setdefault(_compact(key), [])
+            if key not in same_compact:
+                same_compact.append(key)
+
+    def lookup(self, query, sentences=SUMMARY_SENTENCES):
+        """
+        Summary for query: fresh cache hit, else live Wikipedia, else a stale
+        cached copy when Wikipedia can't be reached. Raises if nothing works.
+        """
+        cached = self.get(query, sentences)
+        if cached:
+            return cached
+        try:
+            try:
+                title = query
+                summary = wikipedia.summary(query, sentences=sentences)
+            except wikipedia.exceptions.DisambiguationError as e:
+                # Take the first suggested page instead of giving up
+                title = e.options[0]
+                summary = wikipedia.summary(title, sentences=sentences, auto_suggest=False)
+        except wikipedia.exceptions.PageError:
+            raise
+        except Exception as e:
+            stale = self.get(query, sentences, allow_stale=True)
+            if stale:
+                print(f"⚠️ Wikipedia unavailable, using cached summary: {e}", flush=True)
+                return stale
+            raise
+        self.put(query, title, summary, sentences)
+        if normalize_title(title) != normalize_title(query):
+            self.put(title, title, summary, sentences)
+        return summary
+
+    def prefetch(self, topics, sentences=SUMMARY_SENTENCES):
+        """Warm the cache for a list of topics; returns how many were fetched"""
+        fetched = 0
+        for topic in topics:
+            topic = topic.strip()
+            if not topic or self.get(topic, sentences):
+                continue
+            try:
+                self.lookup(topic, sentences=sentences)
+                fetched += 1
+                print(f"✅ Cached: {topic}", flush=True)
+            except Exception as e:
+                print(f"⚠️ Could not cache {topic}: {e}", flush=True)
+        return fetched
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+if __name__ == "__main__":
+    # Usage: python wiki_cache.py prefetch topics.txt
+    if len(sys.argv) != 3 or sys.argv[1] != "prefetch":
+        print("Usage: python wiki_cache.py prefetch <topics file>")
+        sys.exit(1)
+    with open(sys.argv[2], "r", encoding="utf-8") as f:
+        topics = f.readlines()
+    cache = WikiCache()
+    count = cache.prefetch(topics)
+    cache.close()
+    print(f"✅ Prefetched {count} of {len(topics)} topics into {CACHE_PATH}")